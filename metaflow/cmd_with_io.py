@@ -1,23 +1,128 @@
+import os
+import re
+import shlex
 import subprocess
+import threading
 from .exception import ExternalCommandFailed
 
 from metaflow.util import to_bytes
 
-def cmd(cmdline, input, output):
-    for path, data in input.items():
-        with open(path, 'wb') as f:
-            f.write(to_bytes(data))
+# Anything the shell would interpret; command lines without these are plain
+# argv lists and can be executed without spawning /bin/sh
+_SHELL_META_RE = re.compile(r'[|&;<>()$`\\"\'*?\[\]{}#~=%!\n]')
 
-    if subprocess.call(cmdline, shell=True):
-        raise ExternalCommandFailed("Command '%s' returned a non-zero "
-                                    "exit code." % cmdline)
+# Maximum number of threads used to materialize inputs
+MAX_IO_THREADS = 8
+
+# Threads only pay for their startup once there is enough data to write;
+# below this total size, inputs are written one after the other.
+PARALLEL_WRITE_MIN_BYTES = 8 * 1024 * 1024
+
+def _write_file(path, data):
+    # The payload is written in one go so an intermediate write buffer
+    # only adds a copy; write straight to the fd and loop on short writes.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _read_file(path):
+    # Size the read from fstat so the common case is a single read into a
+    # single allocation.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        remaining = os.fstat(fd).st_size
+        while True:
+            chunk = os.read(fd, max(remaining, 1 << 16))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    finally:
+        os.close(fd)
+    if len(chunks) == 1:
+        return chunks[0]
+    return b''.join(chunks)
+
+def _map_io(func, args):
+    # os.read/os.write release the GIL so a handful of threads overlap the
+    # syscalls when there is a lot of data to move.
+    results = [None] * len(args)
+    errors = []
+    todo = iter(enumerate(args))
+    lock = threading.Lock()
+
+    def worker():
+        while not errors:
+            with lock:
+                item = next(todo, None)
+            if item is None:
+                return
+            idx, a = item
+            try:
+                results[idx] = func(*a)
+            except Exception as ex:
+                errors.append(ex)
 
-    out = []
-    for path in output:
-        with open(path, 'rb') as f:
-            out.append(f.read())
+    threads = [threading.Thread(target=worker)
+               for _ in range(min(MAX_IO_THREADS, len(args)))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+    return results
 
-    if len(out) == 1:
-        return out[0]
+def _call(cmdline):
+    if isinstance(cmdline, (list, tuple)):
+        if not cmdline:
+            raise ExternalCommandFailed("Empty command")
+        args, shell = list(cmdline), False
+    elif _SHELL_META_RE.search(cmdline):
+        args, shell = cmdline, True
     else:
-        return out
+        args, shell = shlex.split(cmdline), False
+        if not args:
+            # Empty command line; the shell treats it as a no-op
+            args, shell = cmdline, True
+    # stdio is inherited so no pipes (and no pipe buffers) are created, and
+    # no fds are opened by us that could leak into the child.
+    try:
+        return subprocess.call(args, shell=shell, close_fds=False, bufsize=0)
+    except OSError:
+        if shell or isinstance(cmdline, (list, tuple)):
+            raise
+        # Not an executable on PATH (e.g. a shell builtin); let the shell
+        # handle it exactly as before.
+        return subprocess.call(cmdline, shell=True)
+
+def cmd(cmdline, input, output):
+    """
+    Run cmdline after writing `input` (path -> data) to disk and return the
+    contents of the files listed in `output`.
+
+    cmdline can be a list of arguments, which is executed directly, or a
+    string. Strings are only passed to the shell when they use shell syntax.
+    """
+    inputs = [(path, to_bytes(data)) for path, data in input.items()]
+    if len(inputs) > 1 and \
+            sum(len(data) for _, data in inputs) >= PARALLEL_WRITE_MIN_BYTES:
+        _map_io(_write_file, inputs)
+    else:
+        for path, data in inputs:
+            _write_file(path, data)
+
+    if _call(cmdline):
+        if not isinstance(cmdline, (list, tuple)):
+            cmdline = [cmdline]
+        raise ExternalCommandFailed("Command '%s' returned a non-zero "
+                                    "exit code." % ' '.join(cmdline))
+
+    if len(output) == 1:
+        return _read_file(next(iter(output)))
+    return [_read_file(path) for path in output]
@@ -1,12 +1,11 @@
 import json
 import os
-import re
 import time
 from collections import namedtuple
 from datetime import datetime
 
 from metaflow.exception import MetaflowInternalError
-from metaflow.util import get_username, resolve_identity
+from metaflow.util import get_username, resolve_identity, with_metaclass
 
 
 DataArtifact = namedtuple('DataArtifact',
@@ -15,12 +14,60 @@ DataArtifact = namedtuple('DataArtifact',
 MetaDatum = namedtuple('MetaDatum',
                        'field value type tags')
 
-attempt_id_re = re.compile(r"attempt_id:([0-9]+)")
+# The code package a task runs from is set in its environment when the task
+# is launched and does not change afterwards.
+_CODE_SHA = os.environ.get('METAFLOW_CODE_SHA')
+_CODE_URL = os.environ.get('METAFLOW_CODE_URL')
+_CODE_DS = os.environ.get('METAFLOW_CODE_DS')
+_CODE_PACKAGE_METADATA = json.dumps(
+    {'ds_type': _CODE_DS, 'sha': _CODE_SHA, 'location': _CODE_URL}) \
+    if _CODE_SHA else None
+
+_ASCII_DIGITS = frozenset('0123456789')
+
+# Order of the object types in the hierarchy, used by get_object
+_OBJ_ORDER = {
+    'root': 0,
+    'flow': 1,
+    'run': 2,
+    'step': 3,
+    'task': 4,
+    'artifact': 5,
+    'metadata': 6,
+    'self': 7}
+
+# Tags derived from get_environment_info() for the last environment seen, as
+# (environment, tags). The environment information is stable for the lifetime
+# of the process; a single slot avoids holding on to every environment.
+_env_tags_cache = (None, None)
+
+# The user and identity do not change during the lifetime of the process;
+# they are resolved on first use and reused for every object registered.
+_NOT_SET = object()
+_username = _NOT_SET
+_identity = None
+
+def _get_username():
+    global _username
+    if _username is _NOT_SET:
+        _username = get_username()
+    return _username
+
+def _resolve_identity():
+    # resolve_identity() raises if the user is unknown; only cache a success
+    global _identity
+    if _identity is None:
+        _identity = resolve_identity()
+    return _identity
+
+if hasattr(time, 'time_ns'):
+    def _epoch_ms():
+        return time.time_ns() // 1000000
+else:
+    def _epoch_ms():
+        return int(round(time.time() * 1000))
 
 class MetadataProviderMeta(type):
-    def __new__(metaname, classname, bases, attrs):
-        return type.__new__(metaname, classname, bases, attrs)
-
     def _get_info(classobject):
         if not classobject._INFO:
             classobject._INFO = classobject.default_info()
@@ -36,19 +83,7 @@ class MetadataProviderMeta(type):
     INFO = property(_get_info, _set_info)
 
 
-# From https://stackoverflow.com/questions/22409430/portable-meta-class-between-python2-and-python3
-def with_metaclass(mcls):
-    def decorator(cls):
-        body = vars(cls).copy()
-        # clean out class body
-        body.pop('__dict__', None)
-        body.pop('__weakref__', None)
-        return mcls(cls.__name__, cls.__bases__, body)
-    return decorator
-
-
-@with_metaclass(MetadataProviderMeta)
-class MetadataProvider(object):
+class MetadataProvider(with_metaclass(MetadataProviderMeta, object)):
 
     @classmethod
     def compute_info(cls, val):
@@ -191,7 +226,7 @@ class MetadataProvider(object):
             Environment variables from this metadata provider
         '''
         return {'METAFLOW_RUNTIME_NAME': runtime_name,
-                'USER': get_username()}
+                'USER': _get_username()}
 
     def register_data_artifacts(self,
                                 run_id,
@@ -358,17 +393,8 @@ class MetadataProvider(object):
             object or list :
                 Depending on the call, the type of object return varies
         '''
-        obj_order = {
-            'root': 0,
-            'flow': 1,
-            'run': 2,
-            'step': 3,
-            'task': 4,
-            'artifact': 5,
-            'metadata': 6,
-            'self': 7}
-        type_order = obj_order.get(obj_type)
-        sub_order = obj_order.get(sub_type)
+        type_order = _OBJ_ORDER.get(obj_type)
+        sub_order = _OBJ_ORDER.get(sub_type)
 
         if type_order is None:
             raise MetaflowInternalError(msg='Cannot find type %s' % obj_type)
@@ -385,15 +411,18 @@ class MetadataProvider(object):
         if sub_type == 'metadata' and obj_type != 'task':
             raise MetaflowInternalError(msg='Metadata can only be retrieved at the task level')
 
-        if attempt is not None:
+        if attempt is None:
+            attempt_int = None
+        elif type(attempt) is int and attempt >= 0:
+            # Exactly int; bools and other int subclasses go through int()
+            attempt_int = attempt
+        else:
             try:
                 attempt_int = int(attempt)
                 if attempt_int < 0:
                     raise ValueError("Attempt can only be positive")
             except ValueError:
                 raise ValueError("Attempt can only be a positive integer")
-        else:
-            attempt_int = None
 
         pre_filter = cls._get_object_internal(
             obj_type, type_order, sub_type, sub_order, filters, attempt_int, *args)
@@ -404,13 +433,13 @@ class MetadataProvider(object):
             pre_filter, attempt_int)
 
     def _all_obj_elements(self, tags=None, sys_tags=None):
-        user = get_username()
+        user = _get_username()
         return {
             'flow_id': self._flow_name,
             'user_name': user,
             'tags': list(tags) if tags else [],
             'system_tags': list(sys_tags) if sys_tags else [],
-            'ts_epoch': int(round(time.time() * 1000))}
+            'ts_epoch': _epoch_ms()}
 
     def _flow_to_json(self):
         # No need to store tags, sys_tags or username at the flow level
@@ -418,7 +447,7 @@ class MetadataProvider(object):
         # store tags, sys_tags and username
         return {
             'flow_id': self._flow_name,
-            'ts_epoch': int(round(time.time() * 1000))}
+            'ts_epoch': _epoch_ms()}
 
     def _run_to_json(self, run_id=None, tags=None, sys_tags=None):
         if run_id is not None:
@@ -455,106 +484,121 @@ class MetadataProvider(object):
         return self._flow_to_json()
 
     def _artifacts_to_json(self, run_id, step_name, task_id, attempt_id, artifacts):
-        result = []
-        for art in artifacts:
-            d = {
-                'run_number': run_id,
-                'step_name': step_name,
-                'task_id': task_id,
-                'attempt_id': attempt_id,
-                'name': art.name,
-                'content_type': art.type,
-                'type': 'metaflow.artifact',
-                'sha': art.sha,
-                'ds_type': art.ds_type,
-                'location': art.url if art.url else ':root:%s' % art.ds_root}
-            d.update(self._all_obj_elements(self.sticky_tags, self.sticky_sys_tags))
-            result.append(d)
-        return result
+        # All artifacts in a batch are registered at the same time and share
+        # everything but their own description.
+        common = {
+            'run_number': run_id,
+            'step_name': step_name,
+            'task_id': task_id,
+            'attempt_id': attempt_id,
+            'type': 'metaflow.artifact'}
+        common.update(self._all_obj_elements(self.sticky_tags, self.sticky_sys_tags))
+        return [dict(
+            common,
+            name=art.name,
+            content_type=art.type,
+            sha=art.sha,
+            ds_type=art.ds_type,
+            location=art.url if art.url else ':root:%s' % art.ds_root)
+            for art in artifacts]
 
     def _metadata_to_json(self, run_id, step_name, task_id, metadata):
-        user = get_username()
-        return [{
+        # All metadata in a batch is registered at the same time so share
+        # the common fields (including the timestamp) across all entries
+        base = {
             'flow_id': self._flow_name,
             'run_number': run_id,
             'step_name': step_name,
             'task_id': task_id,
-            'field_name': datum.field,
-            'type': datum.type,
-            'value': datum.value,
-            'tags': list(set(datum.tags)) if datum.tags else [],
-            'user_name': user,
-            'ts_epoch': int(round(time.time() * 1000))} for datum in metadata]
+            'user_name': _get_username(),
+            'ts_epoch': _epoch_ms()}
+        return [dict(
+            base,
+            field_name=datum.field,
+            type=datum.type,
+            value=datum.value,
+            tags=list(dict.fromkeys(datum.tags)) if datum.tags else [])
+            for datum in metadata]
 
     def _tags(self):
-        env = self._environment.get_environment_info()
+        global _env_tags_cache
+        cached_env, env_tags = _env_tags_cache
+        if cached_env is not self._environment:
+            env = self._environment.get_environment_info()
+            env_tags = [
+                'runtime:' + env['runtime'],
+                'python_version:' + env['python_version_code']]
+            if env['metaflow_version']:
+                env_tags.append('metaflow_version:' + env['metaflow_version'])
+            if 'metaflow_r_version' in env:
+                env_tags.append('metaflow_r_version:' + env['metaflow_r_version'])
+            if 'r_version_code' in env:
+                env_tags.append('r_version:' + env['r_version_code'])
+            env_tags = tuple(env_tags)
+            _env_tags_cache = (self._environment, env_tags)
         tags = [
-            resolve_identity(),
-            'runtime:' + env['runtime'],
-            'python_version:' + env['python_version_code'],
+            _resolve_identity(),
             'date:' + datetime.utcnow().strftime('%Y-%m-%d')]
-        if env['metaflow_version']:
-            tags.append('metaflow_version:' + env['metaflow_version'])
-        if 'metaflow_r_version' in env:
-            tags.append('metaflow_r_version:' + env['metaflow_r_version'])
-        if 'r_version_code' in env:
-            tags.append('r_version:' + env['r_version_code'])
+        tags.extend(env_tags)
         return tags
 
     def _register_code_package_metadata(self, run_id, step_name, task_id, attempt):
-        metadata = []
-        code_sha = os.environ.get('METAFLOW_CODE_SHA')
-        code_url = os.environ.get('METAFLOW_CODE_URL')
-        code_ds = os.environ.get('METAFLOW_CODE_DS')
-        if code_sha:
-            metadata.append(MetaDatum(
-                field='code-package',
-                value=json.dumps({'ds_type': code_ds, 'sha': code_sha, 'location': code_url}),
-                type='code-package',
-                tags=["attempt_id:{0}".format(attempt)]))
+        if _CODE_PACKAGE_METADATA is None:
+            return
         # We don't tag with attempt_id here because not readily available; this
         # is ok though as this doesn't change from attempt to attempt.
-        if metadata:
-            self.register_metadata(run_id, step_name, task_id, metadata)
+        self.register_metadata(run_id, step_name, task_id, [MetaDatum(
+            field='code-package',
+            value=_CODE_PACKAGE_METADATA,
+            type='code-package',
+            tags=["attempt_id:{0}".format(attempt)])])
 
     @staticmethod
     def _apply_filter(elts, filters):
         if filters is None:
             return elts
-        starting_point = elts
+        any_tag = filters.get('any_tags')
+        tag = filters.get('tags')
+        sys_tag = filters.get('system_tags')
+        if any_tag is None and tag is None and sys_tag is None:
+            return elts
+        # Single pass over the objects; each condition short-circuits so an
+        # object is dropped as soon as one filter does not match.
         result = []
-        for key, value in filters.items():
-            if key == 'any_tags':
-                for obj in starting_point:
-                    if value in obj.get('tags', []) or value in obj.get('system_tags', []):
-                        result.append(obj)
-            if key == 'tags':
-                for obj in starting_point:
-                    if value in obj.get('tags', []):
-                        result.append(obj)
-            if key == 'system_tags':
-                for obj in starting_point:
-                    if value in obj.get('system_tags', []):
-                        result.append(obj)
-            starting_point = result
-            result = []
-        return starting_point
+        for obj in elts:
+            obj_tags = obj.get('tags') or ()
+            obj_sys_tags = obj.get('system_tags') or ()
+            if tag is not None and tag not in obj_tags:
+                continue
+            if sys_tag is not None and sys_tag not in obj_sys_tags:
+                continue
+            if any_tag is not None and \
+                    any_tag not in obj_tags and any_tag not in obj_sys_tags:
+                continue
+            result.append(obj)
+        return result
 
     @staticmethod
     def _reconstruct_metadata_for_attempt(all_metadata, attempt_id):
         have_all_attempt_id = True
-        attempts_start = {}
         post_filter = []
+        # Tags are of the form attempt_id:<digits>; compare against the
+        # expected tag directly and only parse tags that differ from it.
+        prefix = 'attempt_id:'
+        start = len(prefix)
+        target = prefix + str(attempt_id)
         for v in all_metadata:
-            if v['field_name'] == 'attempt':
-                attempts_start[int(v['value'])] = v['ts_epoch']
-            all_tags = v.get('tags')
-            if all_tags is None:
-                all_tags = []
-            for t in all_tags:
-                match_result = attempt_id_re.match(t)
-                if match_result:
-                    if int(match_result.group(1)) == attempt_id:
+            for t in v.get('tags') or ():
+                if t == target:
+                    post_filter.append(v)
+                    break
+                if t.startswith(prefix) and t[start:start + 1] in _ASCII_DIGITS:
+                    # Same as matching attempt_id:([0-9]+) on the start of
+                    # the tag: this is the attempt_id tag, for some attempt.
+                    end = start + 1
+                    while end < len(t) and t[end] in _ASCII_DIGITS:
+                        end += 1
+                    if int(t[start:end]) == attempt_id:
                         post_filter.append(v)
                     break
             else:
@@ -563,13 +607,17 @@ class MetadataProvider(object):
 
         if not have_all_attempt_id:
             # We reconstruct base on the attempts_start
+            attempts_start = {}
+            for v in all_metadata:
+                if v['field_name'] == 'attempt':
+                    attempts_start[int(v['value'])] = v['ts_epoch']
             start_ts = attempts_start.get(attempt_id, -1)
             if start_ts < 0:
                 return [] # No metadata since the attempt hasn't started
             # Doubt we will be using Python in year 3000
             end_ts = attempts_start.get(attempt_id + 1, 32503680000000)
             post_filter = [v for v in all_metadata
-                if v['ts_epoch'] >= start_ts and v['ts_epoch'] < end_ts]
+                if start_ts <= v['ts_epoch'] < end_ts]
 
         return post_filter
 
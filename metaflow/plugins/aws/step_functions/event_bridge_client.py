@@ -10,21 +10,24 @@ class EventBridgeClient(object):
         from ..aws_client import get_aws_client
         self._client = get_aws_client('events')
         self.name = format(name)
+        self._cron = None
+        self._role_arn = None
+        self._state_machine_arn = None
 
     def cron(self, cron):
-        self.cron = cron
+        self._cron = cron
         return self
 
     def role_arn(self, role_arn):
-        self.role_arn = role_arn
+        self._role_arn = role_arn
         return self
 
     def state_machine_arn(self, state_machine_arn):
-        self.state_machine_arn = state_machine_arn
+        self._state_machine_arn = state_machine_arn
         return self
 
     def schedule(self):
-        if not self.cron:
+        if not self._cron:
             # reset the schedule
             self._disable()
         else:
@@ -43,7 +46,7 @@ class EventBridgeClient(object):
         # Generate a new rule or update existing rule.
         self._client.put_rule(
             Name=self.name,
-            ScheduleExpression='cron(%s)' % self.cron,
+            ScheduleExpression='cron(%s)' % self._cron,
             Description='Metaflow generated rule for %s' % self.name,
             State='ENABLED'
         )
@@ -53,10 +56,10 @@ class EventBridgeClient(object):
             Targets=[
                 {
                     'Id':self.name,
-                    'Arn':self.state_machine_arn,
+                    'Arn':self._state_machine_arn,
                     # Set input parameters to empty.
                     'Input':json.dumps({'Parameters':json.dumps({})}),
-                    'RoleArn':self.role_arn
+                    'RoleArn':self._role_arn
                 }
             ]
         )
@@ -65,6 +68,8 @@ def format(name):
     # AWS Event Bridge has a limit of 64 chars for rule names.
     # We truncate the rule name if the computed name is greater
     # than 64 chars and append a hashed suffix to ensure uniqueness.
+    # The suffix must stay stable across releases: it names rules that
+    # already exist in users' accounts.
     if len(name) > 64:
         name_hash = to_unicode(
                         base64.b32encode(
@@ -27,13 +27,17 @@ def __try_op__(op_name, op, retries, *args):
         If all retries are exhausted, socket.timeout is raised
 
     """
-    for i in range(retries):
+    if retries > 0:
+        # Most operations succeed on the first try so keep that path short
         try:
-            result = op(*args)
-            return result
+            return op(*args)
         except socket.timeout:
             pass
-    else:
-        raise socket.timeout(
-            "Timeout after {} retries on operation " "'{}'".format(retries, op_name)
-        )
+        for _ in range(retries - 1):
+            try:
+                return op(*args)
+            except socket.timeout:
+                pass
+    raise socket.timeout(
+        "Timeout after {} retries on operation " "'{}'".format(retries, op_name)
+    )
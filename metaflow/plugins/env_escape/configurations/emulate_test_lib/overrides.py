@@ -1,3 +1,5 @@
+import logging
+
 from metaflow.plugins.env_escape.override_decorators import (
     local_override,
     local_getattr_override,
@@ -9,51 +11,55 @@ from metaflow.plugins.env_escape.override_decorators import (
     remote_exception_serialize,
 )
 
+# Overrides run on every intercepted call so log at debug level (a no-op
+# unless enabled) instead of printing.
+logger = logging.getLogger(__name__)
+
 
 @local_override({"test_lib.TestClass1": "print_value"})
 def local_print_value(stub, func):
-    print("Encoding before sending to server")
+    logger.debug("Encoding before sending to server")
     v = func()
-    print("Adding 5")
+    logger.debug("Adding 5")
     return v + 5
 
 
 @remote_override({"test_lib.TestClass1": "print_value"})
 def remote_print_value(obj, func):
-    print("Decoding from client")
+    logger.debug("Decoding from client")
     v = func()
-    print("Encoding for client")
+    logger.debug("Encoding for client")
     return v
 
 @local_getattr_override({"test_lib.TestClass1": "override_value"})
 def local_get_value2(stub, name, func):
-    print("In local getattr override for %s" % name)
+    logger.debug("In local getattr override for %s", name)
     r = func()
-    print("In local getattr override, got %s" % r)
+    logger.debug("In local getattr override, got %s", r)
     return r
 
 
 @local_setattr_override({"test_lib.TestClass1": "override_value"})
 def local_set_value2(stub, name, func, v):
-    print("In local setattr override for %s" % name)
+    logger.debug("In local setattr override for %s", name)
     r = func(v)
-    print("In local setattr override, got %s" % r)
+    logger.debug("In local setattr override, got %s", r)
     return r
 
 
 @remote_getattr_override({"test_lib.TestClass1": "override_value"})
 def remote_get_value2(obj, name):
-    print("In remote getattr override for %s" % name)
+    logger.debug("In remote getattr override for %s", name)
     r = getattr(obj, name)
-    print("In remote getattr override, got %s" % r)
+    logger.debug("In remote getattr override, got %s", r)
     return r
 
 
 @remote_setattr_override({"test_lib.TestClass1": "override_value"})
 def remote_set_value2(obj, name, v):
-    print("In remote setattr override for %s" % name)
+    logger.debug("In remote setattr override for %s", name)
     r = setattr(obj, name, v)
-    print("In remote setattr override, got %s" % r)
+    logger.debug("In remote setattr override, got %s", r)
     return r
 
 
@@ -64,14 +70,14 @@ def unsupported_method(stub, func, *args, **kwargs):
 
 @local_override({"test_lib.package.TestClass3": "thirdfunction"})
 def iamthelocalthird(stub, func, val):
-    print("Locally the Third")
+    logger.debug("Locally the Third")
     v = func(val)
     return v
 
 
 @remote_override({"test_lib.package.TestClass3": "thirdfunction"})
 def iamtheremotethird(obj, func, val):
-    print("Remotely the Third")
+    logger.debug("Remotely the Third")
     v = func(val)
     return v
 
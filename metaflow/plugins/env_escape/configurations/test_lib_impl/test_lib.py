@@ -59,25 +59,34 @@ class TestClass1(object):
 
 class TestClass2(object):
     def __init__(self, value, stride, count):
-        self._mylist = [value + stride * i for i in range(count)]
+        # Values are computed on the fly; no need to store the whole sequence
+        self._start = value
+        self._stride = stride
+        self._count = count
 
     def something(self, val):
         return "In Test2 with %s" % val
 
+    # The object is its own iterator (rather than returning a generator) so
+    # that iterating through the environment escape only involves this
+    # exported class.
     def __iter__(self):
         self._pos = 0
         return self
 
     def __next__(self):
-        if self._pos < len(self._mylist):
+        if self._pos < self._count:
             self._pos += 1
-            return self._mylist[self._pos - 1]
+            return self._start + self._stride * (self._pos - 1)
         raise StopIteration
 
+    next = __next__  # Python 2
+
 
 class TestClass3(object):
     def __init__(self):
         print("I am Class3")
+        self._indirections = {}
 
     def thirdfunction(self, val):
         print("Got value: %s" % val)
@@ -90,7 +99,12 @@ class TestClass3(object):
         setattr(self, name, value)
 
     def weird_indirection(self, name):
-        return functools.partial(self.__hidden, name)
+        # Reuse the partial for a given name. This must remain a
+        # functools.partial as that is what is proxied by the escape.
+        p = self._indirections.get(name)
+        if p is None:
+            p = self._indirections[name] = functools.partial(self.__hidden, name)
+        return p
 
 
 def test_func(*args, **kwargs):
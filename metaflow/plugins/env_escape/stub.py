@@ -1,6 +1,8 @@
 import functools
 import pickle
 
+from metaflow.util import with_metaclass
+
 from .consts import (
     OP_GETATTR,
     OP_SETATTR,
@@ -76,16 +78,6 @@ class StubMetaClass(type):
             return "<stub class '%s'>" % (self.__name__,)
 
 
-def with_metaclass(meta, *bases):
-    """Create a base class with a metaclass."""
-    # Compatibility 2/3. Remove when only 3 support
-    class metaclass(type):
-        def __new__(cls, name, this_bases, d):
-            return meta(name, bases, d)
-
-    return type.__new__(metaclass, "temporary_class", (), {})
-
-
 class Stub(with_metaclass(StubMetaClass, object)):
     """
     Local reference to a remote object.
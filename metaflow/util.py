@@ -73,6 +73,16 @@ class TempDir(object):
         shutil.rmtree(self.name)
 
 
+def with_metaclass(meta, *bases):
+    """Create a base class with a metaclass."""
+    # Compatibility 2/3. Remove when only 3 support
+    class metaclass(type):
+        def __new__(cls, name, this_bases, d):
+            return meta(name, bases, d)
+
+    return type.__new__(metaclass, "temporary_class", (), {})
+
+
 def cached_property(getter):
     @wraps(getter)
     def exec_once(self):
@@ -0,0 +1,79 @@
+import subprocess
+
+import pytest
+
+from metaflow import cmd_with_io
+from metaflow.cmd_with_io import cmd
+from metaflow.exception import ExternalCommandFailed
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    # Record how subprocess.call is invoked while still running the command
+    recorded = []
+    real_call = subprocess.call
+
+    def spy(args, **kwargs):
+        recorded.append((args, kwargs.get('shell', False)))
+        return real_call(args, **kwargs)
+
+    monkeypatch.setattr(cmd_with_io.subprocess, 'call', spy)
+    return recorded
+
+
+def test_metacharacters_use_shell(tmp_path, calls):
+    src, dst = str(tmp_path / 'in'), str(tmp_path / 'out')
+    cmdline = 'cat %s | tr a-z A-Z > %s' % (src, dst)
+    assert cmd(cmdline, {src: 'hello'}, [dst]) == b'HELLO'
+    assert calls == [(cmdline, True)]
+
+
+def test_plain_string_uses_argv(tmp_path, calls):
+    src, dst = str(tmp_path / 'in'), str(tmp_path / 'out')
+    assert cmd('cp %s %s' % (src, dst), {src: 'hello'}, [dst]) == b'hello'
+    assert calls == [(['cp', src, dst], False)]
+
+
+def test_list_argv(tmp_path, calls):
+    src, dst = str(tmp_path / 'in'), str(tmp_path / 'out')
+    assert cmd(['cp', src, dst], {src: b'hello'}, [dst]) == b'hello'
+    assert calls == [(['cp', src, dst], False)]
+
+
+def test_builtin_falls_back_to_shell(calls):
+    with pytest.raises(ExternalCommandFailed):
+        cmd('exit 3', {}, [])
+    assert calls[-1] == ('exit 3', True)
+    assert cmd('exit 0', {}, []) == []
+
+
+@pytest.mark.parametrize('cmdline', ['false', ['false']])
+def test_non_zero_exit_raises(cmdline):
+    with pytest.raises(ExternalCommandFailed):
+        cmd(cmdline, {}, [])
+
+
+@pytest.mark.parametrize('cmdline', ['', '   '])
+def test_empty_command_line(cmdline, calls):
+    assert cmd(cmdline, {}, []) == []
+    assert calls == [(cmdline, True)]
+
+
+def test_multiple_outputs(tmp_path):
+    inputs = dict((str(tmp_path / str(i)), str(i) * i) for i in range(1, 5))
+    paths = sorted(inputs)
+    assert cmd('true', inputs, paths) == \
+        [inputs[p].encode('utf-8') for p in paths]
+
+
+def test_empty_argv_raises():
+    with pytest.raises(ExternalCommandFailed):
+        cmd([], {}, [])
+
+
+def test_large_inputs_written_in_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(cmd_with_io, 'PARALLEL_WRITE_MIN_BYTES', 10)
+    inputs = dict((str(tmp_path / str(i)), 'x' * (i + 5)) for i in range(4))
+    paths = sorted(inputs)
+    assert cmd('true', inputs, paths) == \
+        [inputs[p].encode('utf-8') for p in paths]
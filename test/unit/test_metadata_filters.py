@@ -0,0 +1,68 @@
+import pytest
+
+from metaflow.metadata import MetadataProvider
+
+apply_filter = MetadataProvider._apply_filter
+reconstruct = MetadataProvider._reconstruct_metadata_for_attempt
+
+OBJECTS = [
+    {'id': 0, 'tags': ['a', 'b'], 'system_tags': ['s']},
+    {'id': 1, 'tags': ['a'], 'system_tags': None},
+    {'id': 2, 'tags': None, 'system_tags': ['a', 's']},
+    {'id': 3},
+]
+
+
+@pytest.mark.parametrize('filters,expected', [
+    (None, [0, 1, 2, 3]),
+    ({}, [0, 1, 2, 3]),
+    ({'tags': 'a'}, [0, 1]),
+    ({'system_tags': 's'}, [0, 2]),
+    ({'any_tags': 'a'}, [0, 1, 2]),
+    ({'tags': 'a', 'system_tags': 's'}, [0]),
+    ({'any_tags': 's', 'tags': 'b'}, [0]),
+    ({'any_tags': 'a', 'system_tags': 's'}, [0, 2]),
+    ({'tags': 'missing'}, []),
+])
+def test_apply_filter(filters, expected):
+    assert [o['id'] for o in apply_filter(OBJECTS, filters)] == expected
+
+
+def _md(name, ts, tags, value='0', field=None):
+    return {'field_name': field or name, 'value': value, 'ts_epoch': ts,
+            'tags': tags, 'name': name}
+
+
+def _names(metadata):
+    return [m['name'] for m in metadata]
+
+
+def test_reconstruct_tagged():
+    metadata = [
+        _md('attempt0', 1, ['attempt_id:0'], field='attempt'),
+        _md('x', 2, ['other', 'attempt_id:0']),
+        _md('attempt1', 3, ['attempt_id:1'], value='1', field='attempt'),
+        _md('y', 4, ['attempt_id:1']),
+        _md('z', 5, ['attempt_id:10']),
+        _md('padded', 6, ['attempt_id:01']),
+        _md('suffix', 7, ['attempt_id:1x', 'attempt_id:0']),
+    ]
+    assert _names(reconstruct(metadata, 0)) == ['attempt0', 'x']
+    assert _names(reconstruct(metadata, 1)) == \
+        ['attempt1', 'y', 'padded', 'suffix']
+    assert _names(reconstruct(metadata, 10)) == ['z']
+    assert reconstruct(metadata, 2) == []
+
+
+def test_reconstruct_ts_window_fallback():
+    # Older metadata has no attempt_id tags; attempts are then delimited by
+    # the timestamps of the 'attempt' metadata
+    metadata = [
+        _md('y', 4, None),
+        _md('attempt0', 1, [], field='attempt'),
+        _md('x', 2, ['attempt_id:']),
+        _md('attempt1', 3, None, value='1', field='attempt'),
+    ]
+    assert _names(reconstruct(metadata, 0)) == ['attempt0', 'x']
+    assert _names(reconstruct(metadata, 1)) == ['y', 'attempt1']
+    assert reconstruct(metadata, 2) == []
@@ -0,0 +1,68 @@
+import json
+import pickle
+from collections import namedtuple
+
+import pytest
+
+from metaflow.metadata import DataArtifact, MetaDatum
+
+# DataArtifact and MetaDatum are public and must keep behaving as namedtuples
+DataArtifactTuple = namedtuple('DataArtifact', 'name ds_type ds_root url type sha')
+
+
+def _artifact():
+    return DataArtifact('n', 's3', 'root', None, 'text', 'sha')
+
+
+def test_behaves_like_namedtuple():
+    d = _artifact()
+    t = DataArtifactTuple('n', 's3', 'root', None, 'text', 'sha')
+    assert d == t and t == d
+    assert d == tuple(t) and tuple(t) == d
+    assert hash(d) == hash(t)
+    assert {d: 1}[t] == 1
+    assert DataArtifact._fields == DataArtifactTuple._fields
+    assert list(d._asdict().items()) == list(t._asdict().items())
+    assert DataArtifact._make(t) == d
+
+
+def test_is_a_tuple():
+    d = _artifact()
+    assert isinstance(d, tuple)
+    assert json.loads(json.dumps(d)) == ['n', 's3', 'root', None, 'text', 'sha']
+
+
+def test_sequence_access():
+    d = _artifact()
+    assert len(d) == 6
+    assert d[0] == 'n' and d[-1] == 'sha'
+    assert d[1:3] == ('s3', 'root')
+    name, ds_type, ds_root, url, content_type, sha = d
+    assert (name, url) == ('n', None)
+
+
+def test_replace():
+    d = _artifact()
+    r = d._replace(url='s3://bucket/key')
+    assert r.url == 's3://bucket/key' and r.name == 'n'
+    assert d.url is None
+    with pytest.raises(ValueError):
+        d._replace(bogus=1)
+
+
+def test_metadatum():
+    m = MetaDatum(field='attempt', value='0', type='attempt', tags=['attempt_id:0'])
+    assert m == MetaDatum('attempt', '0', 'attempt', ['attempt_id:0'])
+    assert m != MetaDatum('attempt', '1', 'attempt', ['attempt_id:0'])
+    assert m != 'attempt'
+    # Like a namedtuple holding a list, it is not hashable
+    with pytest.raises(TypeError):
+        hash(m)
+    with pytest.raises(AttributeError):
+        m.other = 1
+
+
+@pytest.mark.parametrize('protocol', [0, pickle.HIGHEST_PROTOCOL])
+def test_pickle(protocol):
+    d = _artifact()
+    assert pickle.loads(pickle.dumps(d, protocol)) == d